@@ -0,0 +1,24 @@
+"""Environment configuration for the survey app and merge script."""
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
+HF_TOKEN = os.getenv("HF_TOKEN")
+HF_DATASET_REPO = os.getenv("HF_DATASET_REPO")
+HF_RESPONSES_DIR = os.getenv("HF_RESPONSES_DIR", "responses")  # one shard per participant
+HF_DATASET_PATH = os.getenv("HF_DATASET_PATH", "responses.csv")  # CSV written by older versions
+HF_MERGED_PATH = os.getenv("HF_MERGED_PATH", "responses.parquet")  # merged Parquet table
+
+# Hugging Face Hub is imported lazily; enable high-performance Xet transfers
+# before anything imports it and reads its config
+os.environ.setdefault("HF_XET_HIGH_PERFORMANCE", "1")
+
+MISSING_ENV_VARS = tuple(
+    name for name, value in (
+        ("ELEVENLABS_API_KEY", ELEVENLABS_API_KEY),
+        ("HF_TOKEN", HF_TOKEN),
+        ("HF_DATASET_REPO", HF_DATASET_REPO),
+    ) if not value
+)
@@ -0,0 +1,105 @@
+"""Static questionnaire content and voice metadata for the survey app."""
+
+# GAD-7 items and frequency scale
+gad_items = (
+    "Q7.1 Feeling nervous, anxious, or on edge.",
+    "Q7.2 Not being able to stop or control worrying.",
+    "Q7.3 Worrying too much about different things.",
+    "Q7.4 Trouble relaxing.",
+    "Q7.5 Being so restless that it is hard to sit still.",
+    "Q7.6 Becoming easily annoyed or irritable.",
+    "Q7.7 Feeling afraid as if something awful might happen."
+)
+gad_scale = (1, 2, 3, 4)
+gad_impact_options = ("Not difficult", "Somewhat", "Very", "Extremely")
+
+# PANAS items and intensity scale
+panas_items = ("Interested","Distressed","Excited","Upset","Strong","Guilty","Scared","Hostile(Aggressive)","Enthusiastic","Proud")
+panas_scale = (1, 2, 3, 4, 5)
+
+# Single-item mood rating
+mood_scale = (1, 2, 3, 4, 5)
+
+# Likert scale options for the voice sessions
+five_scale = ("1 = Strongly Disagree", "2", "3", "4", "5 = Strongly Agree")
+
+# State anxiety rating asked after each voice session
+anxiety_scale = (1, 2, 3, 4, 5)
+anxiety_labels = ("Not at all anxious", "Slightly anxious", "Moderately anxious", "Very anxious", "Extremely anxious")
+
+# Define questions
+empathetic_questions = {
+    "Q11": "I felt the voice was warm and caring.",
+    "Q12": "The voice seemed to understand or respond to my feelings.",
+    "Q13": "I felt comfortable listening to this voice.",
+    "Q14": "The voice spoke in a calm, soothing tone.",
+    "Q15": "I would trust this voice to give helpful advice.",
+    "Q16": "The voice helped me feel supported.",
+    "Q17": "The pace (speed) of the voice’s speech was comfortable.",
+    "Q18": "I found it easy to pay attention to this voice."
+}
+
+neutral_questions = {
+    "Q20": "The voice sounded neutral or robotic (monotone).",
+    "Q21": "I felt the voice gave factual, impersonal responses.",
+    "Q22": "I felt comfortable listening to this voice.",
+    "Q23": "I would trust this voice to give accurate information.",
+    "Q24": "The voice’s tone seemed emotionless.",
+    "Q25": "The pace of the voice’s speech was comfortable.",
+    "Q26": "I found it easy to pay attention to this voice.",
+    "Q27": "The voice delivered the information clearly and understandably."
+}
+
+default_voice_metadata = {
+    "Rachel": {"gender": "Female", "accent": "American", "description": "Casual, matter-of-fact, personable"},
+    "Clyde": {"gender": "Male", "accent": "American", "description": "Intense, great for characters"},
+    "Roger": {"gender": "Male", "accent": "American", "description": "Classy, easy-going"},
+    "Sarah": {"gender": "Female", "accent": "American", "description": "Professional, confident, warm"},
+    "Laura": {"gender": "Female", "accent": "American", "description": "Sassy, sunny enthusiasm, quirky"},
+    "Thomas": {"gender": "Male", "accent": "American", "description": "Meditative, soft, subdued"},
+    "Charlie": {"gender": "Male", "accent": "Australian", "description": "Hyped, confident, energetic"},
+    "George": {"gender": "Male", "accent": "British", "description": "Mature, warm resonance"},
+    "Callum": {"gender": "Male", "accent": "Neutral", "description": "Gravelly, unsettling edge"},
+    "River": {"gender": "Neutral", "accent": "American", "description": "Calm, relaxed, neutral"},
+    "Harry": {"gender": "Male", "accent": "American", "description": "Rough, animated warrior, young"},
+    "Liam": {"gender": "Male", "accent": "American", "description": "Confident, energetic, warm, young"},
+    "Alice": {"gender": "Female", "accent": "British", "description": "Clear, engaging, professional, friendly (e-learning suitable)"},
+    "Matilda": {"gender": "Female", "accent": "American", "description": "Upbeat, professional, pleasing alto pitch, educational"},
+    "Will": {"gender": "Male", "accent": "American", "description": "Chill, conversational, laid back, young"},
+    "Jessica": {"gender": "Female", "accent": "American", "description": "Cute, young, playful, trendy"},
+    "Eric": {"gender": "Male", "accent": "American", "description": "Classy, smooth tenor, middle-aged"},
+    "Chris": {"gender": "Male", "accent": "American", "description": "Casual, natural, down-to-earth, middle-aged"},
+    "Brian": {"gender": "Male", "accent": "American", "description": "Classy, resonant, comforting, middle-aged"},
+    "Daniel": {"gender": "Male", "accent": "British", "description": "Formal, professional, broadcast/news, middle-aged"},
+    "Lily": {"gender": "Female", "accent": "British", "description": "Confident, warm, velvety, narration, middle-aged"},
+    "Bill": {"gender": "Male", "accent": "American", "description": "Crisp, friendly, comforting, old"},
+}
+
+
+# Widget keys for the Likert answers. They double as the response record
+# columns, and are precomputed so submit does no key formatting.
+def _answer_keys(prefix, n):
+    return tuple(f"{prefix}_q{i}" for i in range(1, n + 1))
+
+gad_keys = _answer_keys("gad", 7)
+panas_keys = _answer_keys("panas", 10)
+emp_keys = _answer_keys("emp", 8)
+emp_post_keys = _answer_keys("emp_post", 7)
+neu_keys = _answer_keys("neu", 8)
+neu_post_keys = _answer_keys("neu_post", 7)
+
+demographic_keys = ("age", "gender", "gender_other", "education",
+                    "voice_exp", "used_assistants", "tech_comfort")
+
+open_ended_keys = ("open_emp", "open_neu", "open_compare", "open_pref",
+                   "open_empathy", "open_trust", "open_triggers",
+                   "open_improve", "open_more_1", "open_more_2")
+
+# Answer widget keys rendered on each step, kept in session state until submit
+step_answer_keys = {
+    "demographics": demographic_keys,
+    "baseline": gad_keys + ("gad_impact",) + panas_keys + ("single_mood",),
+    "session_emp": emp_keys + ("emp_state_anxiety",),
+    "session_neu": neu_keys + ("neu_state_anxiety",),
+    "open": open_ended_keys,
+}
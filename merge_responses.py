@@ -0,0 +1,64 @@
+"""Merge the per-participant response shards into a single Parquet file."""
+import io
+
+import pandas as pd
+
+from config import HF_TOKEN, HF_DATASET_REPO, HF_RESPONSES_DIR, HF_DATASET_PATH, HF_MERGED_PATH
+from huggingface_hub import HfApi, hf_hub_download
+from huggingface_hub.errors import EntryNotFoundError
+
+
+def load_existing_hf_table(repo_id: str, path_in_repo: str):
+    try:
+        local_path = hf_hub_download(
+            repo_id=repo_id,
+            repo_type="dataset",
+            filename=path_in_repo,
+            token=HF_TOKEN
+        )
+    except EntryNotFoundError:
+        # Only a missing file is skipped; network or auth errors must stop the
+        # merge rather than upload a table without that file's rows
+        return None
+    if path_in_repo.endswith(".csv"):
+        return pd.read_csv(local_path)
+    return pd.read_parquet(local_path)
+
+def list_shards(hf_api: HfApi, repo_id: str) -> list:
+    files = hf_api.list_repo_files(repo_id=repo_id, repo_type="dataset", token=HF_TOKEN)
+    return sorted(f for f in files
+                  if f.startswith(f"{HF_RESPONSES_DIR}/") and f.endswith((".parquet", ".csv")))
+
+def main():
+    if HF_MERGED_PATH.endswith(".csv"):
+        raise SystemExit(f"HF_MERGED_PATH must be a Parquet path, got {HF_MERGED_PATH}")
+    hf_api = HfApi(token=HF_TOKEN)
+    shards = list_shards(hf_api, HF_DATASET_REPO)
+    tables = (load_existing_hf_table(HF_DATASET_REPO, path)
+              for path in [HF_DATASET_PATH, HF_MERGED_PATH] + shards)
+    # Skip missing files: an empty object-typed frame in the concat would
+    # upcast integer columns to float
+    frames = [df for df in tables if df is not None]
+    if not frames:
+        print("No responses to merge")
+        return
+
+    merged = pd.concat(frames, ignore_index=True)
+    # A shard that was merged in a previous run replaces its old row
+    merged = merged.drop_duplicates(subset="participant_id", keep="last")
+
+    buf = io.BytesIO()
+    merged.to_parquet(buf, compression="snappy", index=False)
+    buf.seek(0)
+    hf_api.upload_file(
+        path_or_fileobj=buf,
+        path_in_repo=HF_MERGED_PATH,
+        repo_id=HF_DATASET_REPO,
+        repo_type="dataset",
+        token=HF_TOKEN
+    )
+    print(f"Merged {len(shards)} shards into {HF_MERGED_PATH} ({len(merged)} rows)")
+
+
+if __name__ == "__main__":
+    main()